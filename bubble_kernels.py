@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Numba-compiled pixel kernels shared by the overlay scripts.
+
+moviepy's CompositeVideoClip alpha-blends in pure numpy for every
+frame, which is the memory-bound hot loop of compositing. The kernel
+here does the same blend JIT-compiled: rows run in parallel and LLVM
+vectorises the inner RGB multiply. Numba is optional — callers fall
+back to moviepy's own blit when ``blend_rgba`` is ``None``.
+
+When the ahead-of-time extension built by ``kernels.py`` is present it
+is preferred, skipping the LLVM warmup on first call entirely.
+"""
+from __future__ import annotations
+
+try:
+    from bubble_kernels_aot import blend_rgba as _aot_blend_rgba
+except ImportError:  # pragma: no cover - the AOT build is optional
+    _aot_blend_rgba = None
+
+try:
+    import numba
+except ImportError:  # pragma: no cover - numba is optional
+    numba = None
+
+
+if _aot_blend_rgba is not None:
+    blend_rgba = _aot_blend_rgba
+
+elif numba is not None:
+
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def blend_rgba(base, over, alpha, x, y, out):  # pragma: no cover - jitted
+        """Blend ``over`` onto ``base`` at ``(x, y)``, writing into ``out``.
+
+        ``base``/``out`` are (H, W, 3) uint8 frames (they may be the
+        same array), ``over`` is the (h, w, 3) uint8 overlay and
+        ``alpha`` its (h, w) float mask in [0, 1].
+        """
+        h, w = over.shape[0], over.shape[1]
+        for i in numba.prange(h):
+            for j in range(w):
+                a = alpha[i, j]
+                inv = 1.0 - a
+                for c in range(3):
+                    out[y + i, x + j, c] = numba.uint8(
+                        over[i, j, c] * a + base[y + i, x + j, c] * inv
+                    )
+
+else:
+    blend_rgba = None
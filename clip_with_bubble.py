@@ -9,29 +9,88 @@ text, and overlays that bubble at a specific position and timeframe.
 from __future__ import annotations
 
 import argparse
+import copy
+import functools
+import hashlib
 import os
+import subprocess
 import tempfile
 from typing import Tuple, Union
 
-try:
-    import drawsvg as draw
-except ImportError as exc:  # pragma: no cover - drawsvg is optional
-    raise ImportError(
-        "The drawsvg package is required for this script."
-        " Install it with 'pip install drawsvg'."
-    ) from exc
+from overlay_cli import (
+    FFMPEG_POSITIONS,
+    extract_subclip,
+    parse_position,
+    pick_hw_codec,
+    resolve_position,
+)
 
-try:
-    from moviepy.editor import VideoFileClip, CompositeVideoClip, ImageClip
-except ImportError as exc:  # pragma: no cover - moviepy is optional
-    raise ImportError(
-        "The moviepy package is required for this script."
-        " Install it with 'pip install moviepy'."
-    ) from exc
+def _ffmpeg_overlay_position(
+    position: Union[str, Tuple[int, int]]
+) -> Tuple[str, str] | None:
+    """Translate ``position`` into ffmpeg ``overlay`` x/y expressions.
 
+    Returns ``None`` for positions only moviepy understands.
+    """
+    if isinstance(position, tuple):
+        return str(position[0]), str(position[1])
+    return FFMPEG_POSITIONS.get(position)
+
+
+def _overlay_with_ffmpeg(
+    video_path: str,
+    bubble_png: str,
+    output_path: str,
+    clip_start: float | None,
+    clip_end: float | None,
+    bubble_start: float,
+    bubble_end: float | None,
+    xy: Tuple[str, str],
+    hwaccel: str = "auto",
+) -> None:
+    """Composite the bubble in a single ffmpeg invocation.
+
+    ffmpeg's native ``overlay`` filter with an ``enable`` window does the
+    trim, composite, and encode in one subprocess with zero per-frame
+    Python work; the audio track is stream-copied untouched.
+    """
+    x, y = xy
+    if bubble_end is not None:
+        enable = f"between(t,{bubble_start},{bubble_end})"
+    else:
+        enable = f"gte(t,{bubble_start})"
+
+    codec, codec_params = pick_hw_codec(hwaccel)
+    cmd = ["ffmpeg", "-y", "-loglevel", "error"]
+    if clip_start is not None or clip_end is not None:
+        cmd += ["-ss", str(clip_start or 0)]
+        if clip_end is not None:
+            cmd += ["-to", str(clip_end)]
+    cmd += [
+        "-i", video_path,
+        "-i", bubble_png,
+        "-filter_complex", f"[0:v][1:v]overlay={x}:{y}:enable='{enable}'",
+        "-c:v", codec, *codec_params,
+        "-c:a", "copy",
+        output_path,
+    ]
+    subprocess.run(cmd, check=True)
+
+
+# Rendered bubbles are cached here, content-addressed by (text, width, height)
+_BUBBLE_CACHE_DIR = os.path.join(tempfile.gettempdir(), "bubble_cache")
+
+
+@functools.lru_cache(maxsize=8)
+def _bubble_chrome(width: int, height: int):
+    """Build the text-free bubble (rectangle + pointer) for one size.
+
+    The chrome never changes between captions of the same size, so it
+    is built once per ``(width, height)`` and shared; callers copy it
+    and append only the ``Text`` element.
+    """
+    import drawsvg as draw
 
-def create_speech_bubble(text: str, width: int, height: int) -> str:
-    """Create an SVG speech bubble with ``text`` and return a temporary PNG path."""
     drawing = draw.Drawing(width, height, origin=(0, 0))
 
     rect_h = height - 20
@@ -64,21 +123,53 @@ def create_speech_bubble(text: str, width: int, height: int) -> str:
         )
     )
 
+    return drawing
+
+
+def create_speech_bubble(text: str, width: int, height: int) -> str:
+    """Create an SVG speech bubble with ``text`` and return a cached PNG path.
+
+    Identical bubbles are rasterised only once: the PNG is stored under a
+    hash of ``(text, width, height)`` and reused on subsequent calls.
+    """
+    try:
+        import drawsvg as draw
+    except ImportError as exc:  # pragma: no cover - drawsvg is optional
+        raise ImportError(
+            "The drawsvg package is required for this script."
+            " Install it with 'pip install drawsvg'."
+        ) from exc
+
+    key = hashlib.blake2b(
+        f"{text}|{width}|{height}".encode(), digest_size=16
+    ).hexdigest()
+    cached_png = os.path.join(_BUBBLE_CACHE_DIR, f"{key}.png")
+    if os.path.exists(cached_png):
+        return cached_png
+
+    chrome = _bubble_chrome(width, height)
+    drawing = copy.copy(chrome)
+    drawing.elements = list(chrome.elements)  # keep the cached chrome pristine
+
     drawing.append(
         draw.Text(
             text,
             20,
             width / 2,
-            rect_h / 2,
+            (height - 20) / 2,
             center=True,
             valign="middle",
             fill="black",
         )
     )
 
-    tmp = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
-    drawing.save_png(tmp.name)
-    return tmp.name
+    os.makedirs(_BUBBLE_CACHE_DIR, exist_ok=True)
+    # A fixed per-process scratch path skips the mkstemp/O_EXCL dance;
+    # the rename stays atomic so concurrent renders cannot clash
+    tmp_path = f"{cached_png}.{os.getpid()}.tmp"
+    drawing.save_png(tmp_path)
+    os.replace(tmp_path, cached_png)
+    return cached_png
 
 
 def clip_video_with_bubble(
@@ -92,22 +183,68 @@ def clip_video_with_bubble(
     position: Union[str, Tuple[int, int]] = "center",
     bubble_width: int = 300,
     bubble_height: int = 100,
+    hwaccel: str = "auto",
 ) -> None:
     """Extract a clip and overlay a speech bubble on it."""
     bubble_png = create_speech_bubble(text, bubble_width, bubble_height)
 
-    video_clip = VideoFileClip(video_path)
+    # For a static PNG at a position ffmpeg can express, one ffmpeg
+    # invocation replaces the whole moviepy frame pipeline
+    overlay_pos = _ffmpeg_overlay_position(position)
+    if overlay_pos is not None:
+        _overlay_with_ffmpeg(
+            video_path,
+            bubble_png,
+            output_path,
+            clip_start,
+            clip_end,
+            bubble_start,
+            bubble_end,
+            overlay_pos,
+            hwaccel,
+        )
+        return
+
+    # Fall back to moviepy for positions it alone understands. The
+    # import is deferred so the ffmpeg fast path never loads it.
+    try:
+        from moviepy.editor import VideoFileClip, CompositeVideoClip, ImageClip
+    except ImportError as exc:  # pragma: no cover - moviepy is optional
+        raise ImportError(
+            "The moviepy package is required for this script."
+            " Install it with 'pip install moviepy'."
+        ) from exc
+
+    # Trim with ffmpeg before moviepy opens the file, so frames outside
+    # the clip range are never decoded at all
+    trimmed_path = None
     if clip_start is not None or clip_end is not None:
-        video_clip = video_clip.subclip(clip_start or 0, clip_end)
+        fd, trimmed_path = tempfile.mkstemp(suffix=".mp4")
+        os.close(fd)
+        extract_subclip(video_path, clip_start or 0, clip_end, trimmed_path)
+        video_clip = VideoFileClip(trimmed_path)
+    else:
+        video_clip = VideoFileClip(video_path)
 
+    # A constant (x, y) avoids moviepy's per-frame keyword dispatch
+    position = resolve_position(
+        position, video_clip.size, (bubble_width, bubble_height)
+    )
     bubble_clip = ImageClip(bubble_png).set_start(bubble_start).set_position(position)
     if bubble_end is not None:
         bubble_clip = bubble_clip.set_end(bubble_end)
 
     final_clip = CompositeVideoClip([video_clip, bubble_clip])
-    final_clip.write_videofile(output_path, codec="libx264", audio_codec="aac")
+    codec, codec_params = pick_hw_codec(hwaccel)
+    final_clip.write_videofile(
+        output_path,
+        codec=codec,
+        audio_codec="aac",
+        ffmpeg_params=codec_params or None,
+    )
 
-    os.unlink(bubble_png)
+    if trimmed_path is not None:
+        os.unlink(trimmed_path)
 
 
 def parse_args() -> argparse.Namespace:
@@ -143,6 +280,7 @@ def parse_args() -> argparse.Namespace:
     )
     parser.add_argument(
         "--position",
+        type=parse_position,
         default="center",
         help="Position of bubble: (x,y) or keywords like 'center'",
     )
@@ -158,18 +296,17 @@ def parse_args() -> argparse.Namespace:
         default=100,
         help="Bubble height in pixels",
     )
+    parser.add_argument(
+        "--hwaccel",
+        default="auto",
+        choices=["auto", "none", "cuda", "videotoolbox", "qsv", "amf"],
+        help="Hardware encoder to use (default: auto-detect, 'none' forces libx264)",
+    )
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
-    pos: Union[str, Tuple[int, int]]
-    if "," in args.position:
-        x_str, y_str = args.position.split(",", maxsplit=1)
-        pos = (int(x_str), int(y_str))
-    else:
-        pos = args.position
-
     clip_video_with_bubble(
         video_path=args.video,
         output_path=args.output,
@@ -178,9 +315,10 @@ def main() -> None:
         text=args.text,
         bubble_start=args.bubble_start,
         bubble_end=args.bubble_end,
-        position=pos,
+        position=args.position,
         bubble_width=args.bubble_width,
         bubble_height=args.bubble_height,
+        hwaccel=args.hwaccel,
     )
 
 
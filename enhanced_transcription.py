@@ -11,6 +11,8 @@ This script creates a real-time speech-to-text transcription system with advance
 - Enhanced visualization of transcription results
 """
 
+from __future__ import annotations
+
 import os
 import sys
 import time
@@ -19,13 +21,22 @@ import signal
 import threading
 from datetime import datetime
 from dataclasses import dataclass
-from typing import List, Dict, Optional, Union, Any
+from typing import TYPE_CHECKING, List, Dict, Optional, Union, Any
 
 import mlx.core as mx
 import numpy as np
 import sounddevice as sd
-from parakeet_mlx import from_pretrained, AlignedResult, AlignedSentence, AlignedToken
-from parakeet_mlx.audio import get_logmel
+
+# parakeet_mlx is imported lazily (it is slow to load) so utility paths
+# like --list-devices respond immediately
+
+if TYPE_CHECKING:  # annotation-only; the runtime import stays lazy
+    from parakeet_mlx import AlignedResult, AlignedSentence
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - fall back to the stdlib encoder
+    orjson = None
 
 # Configuration
 MODEL_NAME = "mlx-community/parakeet-tdt-0.6b-v2"  # Parakeet model
@@ -34,6 +45,14 @@ BUFFER_DURATION = 5  # Process 5 seconds of audio at a time
 CHANNELS = 1  # Mono audio
 CHUNK_DURATION = 20.0  # Duration of chunks to process (in seconds)
 OVERLAP_DURATION = 4.0  # Overlap between chunks (in seconds)
+MODEL_DTYPE = "bf16"  # Inference dtype (bf16 halves weight bandwidth on Apple Silicon)
+
+# Supported inference dtypes for the --dtype flag
+DTYPES = {
+    "fp32": mx.float32,
+    "fp16": mx.float16,
+    "bf16": mx.bfloat16,
+}
 
 # Terminal colors for prettier output
 COLORS = {
@@ -48,8 +67,9 @@ COLORS = {
     "UNDERLINE": "\033[4m"
 }
 
-# For storing audio data
-audio_queue = queue.Queue()
+# For storing audio data: the capture callback writes straight into this
+# ring (created in process_audio once the chunk sizes are known)
+capture_ring = None
 all_transcriptions = []  # Store all transcriptions for saving later
 transcription_lock = threading.Lock()
 
@@ -65,15 +85,164 @@ class TranscriptionState:
     silence_start: Optional[float] = None
     last_update: Optional[float] = None
 
+class AudioRingBuffer:
+    """Fixed-size single-producer single-consumer ring for float32 audio.
+
+    Accumulating audio with np.vstack copies the whole history on every
+    append; a preallocated ring with head/tail indices makes enqueue and
+    dequeue constant-time and allocation-free no matter how long the
+    recording runs. The producer (audio callback) only ever moves the
+    write index and the consumer only moves the read index, so with
+    CPython's atomic int updates neither side needs a lock.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._ring = np.empty((capacity, CHANNELS), dtype=np.float32)
+        self.write_idx = 0  # Absolute sample counters; modulo capacity for slots
+        self.read_idx = 0
+
+    def __len__(self) -> int:
+        return self.write_idx - self.read_idx
+
+    def try_write(self, data: np.ndarray) -> bool:
+        """Append audio frames; returns False (dropping them) when full.
+
+        Safe to call from the real-time audio callback: the copy goes
+        straight into preallocated storage and the read cursor is never
+        touched.
+        """
+        n = len(data)
+        if len(self) + n > self.capacity:
+            return False
+
+        start = self.write_idx % self.capacity
+        end = start + n
+        if end <= self.capacity:
+            np.copyto(self._ring[start:end], data)
+        else:
+            # Wrap: split the copy at the end of the ring
+            first = self.capacity - start
+            np.copyto(self._ring[start:], data[:first])
+            np.copyto(self._ring[:end - self.capacity], data[first:])
+        self.write_idx += n
+        return True
+
+    def peek(self, n: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Return the next ``n`` samples without consuming them.
+
+        Pass ``out`` to fill a preallocated array instead of allocating a
+        fresh one per call.
+        """
+        if out is None:
+            out = np.empty((n, CHANNELS), dtype=np.float32)
+        start = self.read_idx % self.capacity
+        end = start + n
+        if end <= self.capacity:
+            np.copyto(out, self._ring[start:end])
+        else:
+            first = self.capacity - start
+            np.copyto(out[:first], self._ring[start:])
+            np.copyto(out[first:], self._ring[:end - self.capacity])
+        return out
+
+    def advance(self, n: int) -> None:
+        """Consume ``n`` samples."""
+        self.read_idx += n
+
+    def read(self, n: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Consume and return the next ``n`` samples."""
+        data = self.peek(n, out)
+        self.advance(n)
+        return data
+
+class BatchAccumulator:
+    """Collect audio chunks and run them through the model as one batch.
+
+    Feeding several chunks to ``model.generate`` at once amortizes kernel
+    launch, weight reads, and decoder overhead across utterances, which
+    speeds up offline/post-hoc transcription. A batch size of 1 keeps the
+    original chunk-at-a-time behaviour for low-latency live microphone use.
+    """
+
+    def __init__(self, batch_size: int = 1):
+        self.batch_size = max(1, batch_size)
+        self.pending: List[np.ndarray] = []
+
+    def add(self, audio_1d: np.ndarray) -> None:
+        """Queue a 1D float32 audio chunk for the next batched generate."""
+        self.pending.append(audio_1d)
+
+    def is_full(self) -> bool:
+        return len(self.pending) >= self.batch_size
+
+    def make_mel(self, model, preprocess=None):
+        """Build the mel tensor for all pending chunks.
+
+        Returns ``(mel, count)``, or ``(None, 0)`` when nothing is
+        pending. ``preprocess`` is the compiled clip+logmel graph from
+        ``_make_preprocess``; without it the ops run uncompiled.
+        """
+        if not self.pending:
+            return None, 0
+
+        from parakeet_mlx.audio import get_logmel
+
+        if len(self.pending) == 1:
+            # Single chunk: keep the 1D path so live mode behaves as before
+            batch_mlx = mx.array(self.pending[0])
+        else:
+            # Pad each chunk to the longest so they stack into a (B, T) tensor
+            longest = max(len(audio) for audio in self.pending)
+            padded = np.zeros((len(self.pending), longest), dtype=np.float32)
+            for row, audio in enumerate(self.pending):
+                padded[row, :len(audio)] = audio
+            batch_mlx = mx.array(padded)
+
+        count = len(self.pending)
+        self.pending.clear()
+
+        if preprocess is not None:
+            mel = preprocess(batch_mlx)
+        else:
+            # Clip on-device so preprocessing runs as MLX kernels, not NumPy
+            batch_mlx = mx.clip(batch_mlx, -1.0, 1.0)
+
+            # Log-mel extraction stays in float32; cast down for the model only
+            mel = get_logmel(batch_mlx, model.preprocessor_config)
+            dtype = DTYPES[MODEL_DTYPE]
+            if dtype != mx.float32:
+                mel = mel.astype(dtype)
+        return mel, count
+
+def _make_preprocess(model):
+    """Build a compiled clip + log-mel + cast graph for ``model``.
+
+    Chunk shapes are fixed at startup, so mx.compile can fuse the
+    preprocessing kernels once and skip per-chunk graph construction.
+    The decoder itself stays uncompiled: generate runs a Python decoding
+    loop that cannot be traced.
+    """
+    from parakeet_mlx.audio import get_logmel
+
+    dtype = DTYPES[MODEL_DTYPE]
+
+    @mx.compile
+    def _preprocess(audio):
+        audio = mx.clip(audio, -1.0, 1.0)
+        mel = get_logmel(audio, model.preprocessor_config)
+        if dtype != mx.float32:
+            mel = mel.astype(dtype)
+        return mel
+
+    return _preprocess
+
 # Global state
 state = TranscriptionState()
 
 # Flag to signal when to stop
 stop_event = threading.Event()
 
-# Set device to CPU for stable performance
-mx.set_default_device(mx.cpu)
-
 def colored(text, color):
     """Apply color to terminal text."""
     return f"{COLORS.get(color, '')}{text}{COLORS['ENDC']}"
@@ -82,12 +251,11 @@ def audio_callback(indata, frames, time_info, status):
     """Callback function for sounddevice to capture audio."""
     if status:
         print(f"{colored('Audio status:', 'YELLOW')} {status}")
-    
-    # Add the audio data to the queue without blocking
-    try:
-        audio_queue.put_nowait(indata.copy())
-    except queue.Full:
-        print(colored("Audio queue is full, dropping data!", "RED"))
+
+    # Copy straight into the capture ring: no lock, no queue node, and no
+    # indata.copy() allocation on the real-time audio thread
+    if capture_ring is None or not capture_ring.try_write(indata):
+        print(colored("Audio ring is full, dropping data!", "RED"))
 
 def get_timestamp_display(timestamp):
     """Convert seconds to MM:SS format."""
@@ -95,31 +263,61 @@ def get_timestamp_display(timestamp):
     seconds = int(timestamp % 60)
     return f"{minutes:02d}:{seconds:02d}"
 
+def _srt_ts(timestamp):
+    """Format seconds as an SRT timestamp (HH:MM:SS,mmm)."""
+    hours, rest = divmod(int(timestamp), 3600)
+    minutes, seconds = divmod(rest, 60)
+    millis = int((timestamp - int(timestamp)) * 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{millis:03d}"
+
+def precompute_srt_timestamps(result: AlignedResult):
+    """Attach formatted SRT timestamps to each sentence while it is hot.
+
+    Formatting happens once when the result arrives, so saving a long
+    session just joins precomputed strings instead of doing all the
+    timestamp arithmetic at shutdown.
+    """
+    for sentence in result.sentences:
+        sentence._srt_start = _srt_ts(sentence.start)
+        sentence._srt_end = _srt_ts(sentence.end)
+
+def _render_tokens(sentence: AlignedSentence) -> str:
+    """Build the colored word-timestamp line for ``sentence``."""
+    # Join the parts once; repeated += is quadratic in token count
+    return "".join(
+        f"{colored(token.text, 'BLUE')}[{get_timestamp_display(token.start)}] "
+        for token in sentence.tokens
+        if token.text.strip()
+    )
+
 def display_result(result: AlignedResult, elapsed_time: float, is_final: bool = False):
     """Display transcription results in a nicely formatted way."""
+    # Rate-limit interim updates to ~5 Hz so terminal IO and string
+    # formatting stay out of RTF measurements
+    if not is_final and state.last_update and time.time() - state.last_update < 0.2:
+        return
+
     # Clear previous lines if updating
     if state.last_update and not is_final:
         print("\033[F\033[K" * 3, end="")
-    
+
     # Display header
     status = colored("FINAL", "GREEN") if is_final else colored("INTERIM", "YELLOW")
     print(f"\n{colored('Transcription:', 'HEADER')} [{status}] {colored(f'(RTF: {elapsed_time:.2f}x)', 'CYAN')}")
-    
+
     # Display text (with a fallback if empty)
     text_to_display = result.text if result.text else "[No speech detected]"
     print(f"{colored(text_to_display, 'BOLD')}")
-    
-    # Display word-level timestamps (last sentence only for ongoing transcriptions)
-    if result.sentences and len(result.sentences) > 0:
+
+    # Display word-level timestamps (final results only; skipping the
+    # per-token loop keeps interim updates cheap)
+    if is_final and result.sentences and len(result.sentences) > 0:
         display_sentence = result.sentences[-1]
         if display_sentence and hasattr(display_sentence, 'tokens') and display_sentence.tokens:
-            timestamp_display = ""
-            for token in display_sentence.tokens:
-                if token.text.strip():
-                    timestamp_display += f"{colored(token.text, 'BLUE')}[{get_timestamp_display(token.start)}] "
+            timestamp_display = _render_tokens(display_sentence)
             if timestamp_display:
                 print(timestamp_display)
-    
+
     # Update last update time
     state.last_update = time.time()
 
@@ -138,30 +336,31 @@ def save_transcriptions(output_dir="transcriptions", output_formats=["txt", "srt
     
     # Create text file
     if "txt" in output_formats:
+        lines = [
+            f"[{get_timestamp_display(sentence.start)} - {get_timestamp_display(sentence.end)}] {sentence.text}\n"
+            for result in all_transcriptions
+            for sentence in result.sentences
+        ]
         with open(f"{filename_base}.txt", "w") as f:
-            for result in all_transcriptions:
-                for sentence in result.sentences:
-                    f.write(f"[{get_timestamp_display(sentence.start)} - {get_timestamp_display(sentence.end)}] {sentence.text}\n")
+            f.writelines(lines)
         print(colored(f"Saved transcript to {filename_base}.txt", "GREEN"))
-    
+
     # Create SRT file
     if "srt" in output_formats:
+        lines = []
+        index = 1
+        for result in all_transcriptions:
+            for sentence in result.sentences:
+                start_str = getattr(sentence, "_srt_start", None) or _srt_ts(sentence.start)
+                end_str = getattr(sentence, "_srt_end", None) or _srt_ts(sentence.end)
+                lines.append(f"{index}\n{start_str} --> {end_str}\n{sentence.text}\n\n")
+                index += 1
         with open(f"{filename_base}.srt", "w") as f:
-            index = 1
-            for result in all_transcriptions:
-                for sentence in result.sentences:
-                    # Format time as SRT timestamp (HH:MM:SS,mmm)
-                    start_time = f"{int(sentence.start // 3600):02d}:{int((sentence.start % 3600) // 60):02d}:{int(sentence.start % 60):02d},{int((sentence.start % 1) * 1000):03d}"
-                    end_time = f"{int(sentence.end // 3600):02d}:{int((sentence.end % 3600) // 60):02d}:{int(sentence.end % 60):02d},{int((sentence.end % 1) * 1000):03d}"
-                    
-                    f.write(f"{index}\n{start_time} --> {end_time}\n{sentence.text}\n\n")
-                    index += 1
+            f.writelines(lines)
         print(colored(f"Saved transcript to {filename_base}.srt", "GREEN"))
     
     # Create JSON file
     if "json" in output_formats:
-        import json
-        
         # Convert to serializable format
         json_data = []
         for result in all_transcriptions:
@@ -187,28 +386,49 @@ def save_transcriptions(output_dir="transcriptions", output_formats=["txt", "srt
                 "sentences": sentences
             })
         
-        with open(f"{filename_base}.json", "w") as f:
-            json.dump(json_data, f, indent=2)
+        if orjson is not None:
+            # orjson serializes in native code, several times faster on long sessions
+            with open(f"{filename_base}.json", "wb") as f:
+                f.write(orjson.dumps(json_data, option=orjson.OPT_INDENT_2))
+        else:
+            import json
+            with open(f"{filename_base}.json", "w") as f:
+                json.dump(json_data, f, indent=2)
         print(colored(f"Saved transcript to {filename_base}.json", "GREEN"))
 
-def process_audio(device=None, enable_chunking=True):
-    """Process audio data and generate transcriptions with enhanced features."""
-    global state
-    
-    # Buffer to accumulate audio
-    audio_buffer = np.empty((0, CHANNELS), dtype=np.float32)
+def process_audio(model, preprocess, device=None, enable_chunking=True, batch_size=1):
+    """Process audio data and generate transcriptions with enhanced features.
+
+    ``model`` and ``preprocess`` come preloaded and warmed up from
+    ``main`` so no audio is dropped while the model initialises.
+    """
+    global state, capture_ring
+
+    # Accumulator for batched inference (batch_size=1 keeps the live path)
+    batch = BatchAccumulator(batch_size)
+
+    # Single preallocated ring sized for one chunk plus overlap and slack.
+    # Publishing it lets the capture callback write into it directly.
+    ring_capacity = int((CHUNK_DURATION + OVERLAP_DURATION + BUFFER_DURATION + 5.0) * SAMPLE_RATE)
+    ring = AudioRingBuffer(ring_capacity)
+    capture_ring = ring
     buffer_size = int(BUFFER_DURATION * SAMPLE_RATE)
-    
+
     # Chunk parameters for continuous transcription
     chunk_size = int(CHUNK_DURATION * SAMPLE_RATE) if enable_chunking else None
     overlap_size = int(OVERLAP_DURATION * SAMPLE_RATE) if enable_chunking else None
-    
-    print(colored("Loading Parakeet model...", "BLUE"))
-    start_time = time.time()
-    model = from_pretrained(MODEL_NAME, dtype=mx.float32)
-    load_time = time.time() - start_time
-    print(colored(f"Model loaded in {load_time:.2f} seconds!", "GREEN"))
-    
+
+    # In chunking mode the consumer pulls chunk_size samples at a time;
+    # otherwise it pulls buffer_size segments
+    pull_size = chunk_size if enable_chunking else buffer_size
+
+    # Reusable extraction buffer so the hot loop never allocates. It can
+    # only be reused when batch_size is 1: a pending batch holds
+    # references to earlier chunks, which reuse would overwrite.
+    pull_buf = None
+    if not enable_chunking or batch.batch_size == 1:
+        pull_buf = np.empty((pull_size, CHANNELS), dtype=np.float32)
+
     print("\n" + colored("===== TRANSCRIPTION STARTED =====", "HEADER") + "\n")
     device_info = f" from device: {device}" if device else ""
     print(colored(f"Listening{device_info}... (Press Ctrl+C to stop)", "BLUE") + "\n")
@@ -216,130 +436,114 @@ def process_audio(device=None, enable_chunking=True):
     # Record the start time of the recording
     state.recording_started = time.time()
     
-    # Keep track of all audio for chunking
-    all_audio = np.empty((0, CHANNELS), dtype=np.float32) if enable_chunking else None
-    
-    while not stop_event.is_set():
-        try:
-            # Get audio data with timeout to check stop_event regularly
-            new_audio = audio_queue.get(timeout=0.5)
-            audio_buffer = np.vstack((audio_buffer, new_audio))
-            audio_queue.task_done()
-            
-            # If chunking is enabled, add to all_audio
-            if enable_chunking and all_audio is not None:
-                all_audio = np.vstack((all_audio, new_audio))
-            
-            # Once we have enough audio data, process it
-            if len(audio_buffer) >= buffer_size:
-                # Extract a chunk of audio data
-                current_chunk = audio_buffer[:buffer_size].copy()
-                audio_buffer = audio_buffer[buffer_size:]
-                
-                # Process using full chunking algorithm if enabled and we have enough data
-                if enable_chunking and all_audio is not None and len(all_audio) >= chunk_size:
+    # Stage A feeds mel tensors to stage B through a small bounded queue.
+    # The bound provides backpressure (at most two chunks in flight), and
+    # because MLX releases the GIL inside its kernels the two stages
+    # genuinely overlap: the next chunk's preprocessing hides behind the
+    # current chunk's decode.
+    mel_queue = queue.Queue(maxsize=2)
+
+    def preprocess_worker():
+        """Stage A: watch the capture ring and emit mel tensors."""
+        while not stop_event.is_set():
+            # The callback fills the ring directly; poll until a full
+            # chunk is available, checking stop_event regularly
+            if len(ring) < pull_size:
+                stop_event.wait(0.05)
+                continue
+            try:
+                # Process using the full chunking algorithm
+                if enable_chunking:
                     # Extract the current chunk to process
-                    chunk_to_process = all_audio[:chunk_size].copy()
-                    
+                    chunk_to_process = ring.peek(chunk_size, out=pull_buf)
+
                     # Keep the overlap for the next chunk
                     if overlap_size is not None and overlap_size > 0:
-                        all_audio = all_audio[chunk_size-overlap_size:]
+                        ring.advance(chunk_size - overlap_size)
                     else:
-                        all_audio = all_audio[chunk_size:]
-                    
-                    # Process the chunk with the model
-                    process_start = time.time()
-                    
-                    # Preprocessing: clip and convert to float32
-                    processed_chunk = np.clip(chunk_to_process, -1.0, 1.0).astype(np.float32)
-                    
-                    # Convert to 1D array (flatten) if mono
-                    audio_1d = processed_chunk.flatten()
-                    
-                    # Convert to MLX array
-                    audio_mlx = mx.array(audio_1d)
-                    
-                    # Extract mel spectrogram features
-                    mel = get_logmel(audio_mlx, model.preprocessor_config)
-                    
-                    # Generate transcription
-                    result = model.generate(mel)
-                    
-                    # Handle different return types
-                    if isinstance(result, list) and len(result) > 0:
-                        result = result[0]
-                    
-                    # Ensure we have a valid AlignedResult
-                    if not hasattr(result, 'text'):
-                        print(colored(f"Warning: Got unexpected result type: {type(result)}", "YELLOW"))
+                        ring.advance(chunk_size)
+
+                    # Queue the chunk; only emit once the batch is full
+                    batch.add(chunk_to_process.reshape(-1))
+                    if not batch.is_full():
                         continue
-                    
-                    process_time = time.time() - process_start
-                    rtf = process_time / CHUNK_DURATION
-                    
-                    # Store the result
+
+                    mel, count = batch.make_mel(model, preprocess)
+                    mx.eval(mel)  # force the mel computation into this stage
+                    mel_queue.put((mel, count, CHUNK_DURATION, True))
+
+                # Process an individual segment (used when chunking is disabled)
+                else:
+                    current_chunk = ring.read(buffer_size, out=pull_buf)
+                    mel = preprocess(mx.array(current_chunk.reshape(-1)))
+                    mx.eval(mel)
+                    mel_queue.put((mel, 1, BUFFER_DURATION, False))
+            except Exception as e:
+                print(colored(f"Error in audio preprocessing: {e}", "RED"))
+                import traceback
+                traceback.print_exc()
+
+        # Emit any chunks still waiting in a partially filled batch
+        mel, count = batch.make_mel(model, preprocess)
+        if mel is not None:
+            mel_queue.put((mel, count, CHUNK_DURATION, True))
+
+    pre_thread = threading.Thread(target=preprocess_worker, daemon=True)
+    pre_thread.start()
+
+    # Stage B: run the model on each mel tensor and handle the results
+    while True:
+        try:
+            mel, count, segment_duration, is_final = mel_queue.get(timeout=0.5)
+        except queue.Empty:
+            if stop_event.is_set() and not pre_thread.is_alive():
+                break
+            continue
+        try:
+            process_start = time.time()
+            results = model.generate(mel)
+            process_time = time.time() - process_start
+
+            # model.generate returns a list for batched input
+            if not isinstance(results, list):
+                results = [results]
+            # count is the number of chunks batched into this mel, each
+            # segment_duration long, so it is the audio actually decoded
+            rtf = process_time / (segment_duration * max(1, count))
+
+            for result in results:
+                # Ensure we have a valid AlignedResult
+                if not hasattr(result, 'text'):
+                    print(colored(f"Warning: Got unexpected result type: {type(result)}", "YELLOW"))
+                    continue
+
+                if is_final:
+                    # Store the result with its SRT timestamps prepared
+                    precompute_srt_timestamps(result)
                     with transcription_lock:
                         all_transcriptions.append(result)
-                        state.latest_text = result.text if hasattr(result, 'text') and result.text else state.latest_text
-                    
+                        state.latest_text = result.text if result.text else state.latest_text
+
                     # Display and update state
                     display_result(result, rtf, True)
                     state.chunks_processed += 1
-                    
-                # Process an individual segment (used when chunking is disabled or during startup)
                 else:
-                    # Preprocessing: clip and convert to float32
-                    processed_chunk = np.clip(current_chunk, -1.0, 1.0).astype(np.float32)
-                    
-                    # Convert to 1D array (flatten) if mono
-                    audio_1d = processed_chunk.flatten()
-                    
-                    # Process timing
-                    process_start = time.time()
-                    
-                    # Convert to MLX array
-                    audio_mlx = mx.array(audio_1d)
-                    
-                    # Extract mel spectrogram features
-                    mel = get_logmel(audio_mlx, model.preprocessor_config)
-                    
-                    # Generate transcription
-                    result = model.generate(mel)
-                    
-                    # Handle different return types
-                    if isinstance(result, list) and len(result) > 0:
-                        result = result[0]
-                    
-                    # Ensure we have a valid AlignedResult
-                    if not hasattr(result, 'text'):
-                        print(colored(f"Warning: Got unexpected result type in interim processing: {type(result)}", "YELLOW"))
-                        continue
-                    
-                    process_time = time.time() - process_start
-                    rtf = process_time / BUFFER_DURATION
-                    
-                    # Update state and display
+                    # Interim results are displayed but not stored
                     with transcription_lock:
-                        state.latest_text = result.text if hasattr(result, 'text') and result.text else state.latest_text
-                    
-                    # Display interim results
-                    display_result(result, rtf, False)  
-        
-        except queue.Empty:
-            # No new audio data within timeout period
-            continue
+                        state.latest_text = result.text if result.text else state.latest_text
+                    display_result(result, rtf, False)
         except Exception as e:
             print(colored(f"Error in audio processing: {e}", "RED"))
             import traceback
             traceback.print_exc()
-    
+
     print("\n" + colored("Transcription complete.", "GREEN"))
     return all_transcriptions
 
 def main():
     """Main function to run the enhanced transcription."""
     # Declare globals at the beginning of the function
-    global MODEL_NAME, CHUNK_DURATION, OVERLAP_DURATION
+    global MODEL_NAME, CHUNK_DURATION, OVERLAP_DURATION, MODEL_DTYPE
     
     import sys
     import signal
@@ -371,6 +575,14 @@ def main():
         "--overlap-duration", type=float, default=OVERLAP_DURATION,
         help=f"Overlap between chunks in seconds (default: {OVERLAP_DURATION})"
     )
+    parser.add_argument(
+        "--dtype", type=str, default=MODEL_DTYPE, choices=sorted(DTYPES),
+        help=f"Inference dtype for the model (default: {MODEL_DTYPE})"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=1,
+        help="Number of chunks to batch into one generate call (default: 1; use >=4 for offline transcription)"
+    )
     parser.add_argument(
         "--output-dir", type=str, default="transcriptions",
         help="Directory to save transcriptions (default: transcriptions)"
@@ -386,6 +598,7 @@ def main():
     MODEL_NAME = args.model
     CHUNK_DURATION = args.chunk_duration
     OVERLAP_DURATION = args.overlap_duration
+    MODEL_DTYPE = args.dtype
     
     # List audio devices if requested
     if args.list_devices:
@@ -403,11 +616,27 @@ def main():
     
     # Register our signal handler for CTRL+C (SIGINT)
     signal.signal(signal.SIGINT, signal_handler)
-    
+
+    # Load and warm up the model before the microphone stream opens, so
+    # no audio piles up (and gets dropped) while from_pretrained blocks
+    from parakeet_mlx import from_pretrained
+
+    print(colored("Loading Parakeet model...", "BLUE"))
+    start_time = time.time()
+    model = from_pretrained(MODEL_NAME, dtype=DTYPES[MODEL_DTYPE])
+    load_time = time.time() - start_time
+    print(colored(f"Model loaded in {load_time:.2f} seconds!", "GREEN"))
+
+    # Compile the preprocessing graph and run one generate on silence so
+    # neither compilation nor lazy weight loading hits the first chunk
+    preprocess = _make_preprocess(model)
+    warm_samples = int((BUFFER_DURATION if args.no_chunking else CHUNK_DURATION) * SAMPLE_RATE)
+    model.generate(preprocess(mx.zeros(warm_samples)))
+
     # Start processing thread
     process_thread = threading.Thread(
-        target=process_audio, 
-        args=(args.device, not args.no_chunking)
+        target=process_audio,
+        args=(model, preprocess, args.device, not args.no_chunking, args.batch_size)
     )
     process_thread.daemon = True  # Thread will exit when main thread exits
     process_thread.start()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Ahead-of-time build script for the ``bubble_kernels_aot`` extension.
+
+The JIT kernel in ``bubble_kernels`` pays an LLVM compile of a second
+or more on first call, which dominates short-video runs. Running
+
+    python kernels.py
+
+once (e.g. at install time) produces ``bubble_kernels_aot.cpython-*.so``
+next to the scripts; ``bubble_kernels`` imports the native code at
+startup with no warmup and only falls back to the JIT kernel when the
+extension is absent.
+"""
+from __future__ import annotations
+
+import numpy as np
+from numba.pycc import CC
+
+cc = CC("bubble_kernels_aot")
+
+
+@cc.export(
+    "blend_rgba",
+    "void(u1[:, :, :], u1[:, :, :], f4[:, :], i8, i8, u1[:, :, :])",
+)
+def blend_rgba(base, over, alpha, x, y, out):
+    """AOT twin of ``bubble_kernels.blend_rgba``.
+
+    pycc cannot compile ``parallel=True`` loops, so rows run serially;
+    LLVM still vectorises the inner RGB multiply.
+    """
+    h, w = over.shape[0], over.shape[1]
+    for i in range(h):
+        for j in range(w):
+            a = alpha[i, j]
+            inv = 1.0 - a
+            for c in range(3):
+                out[y + i, x + j, c] = np.uint8(
+                    over[i, j, c] * a + base[y + i, x + j, c] * inv
+                )
+
+
+if __name__ == "__main__":
+    cc.compile()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""Shared helpers for the overlay scripts.
+
+Command-line parsing, encoder selection and ffmpeg trimming used by
+every overlay script live here. Keeping this module free of
+moviepy/drawsvg/framesvg imports means ``--help`` and argument errors
+respond in milliseconds instead of paying the cost of loading the
+whole video stack.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import subprocess
+import sys
+from typing import Tuple, Union
+
+
+def parse_position(value: str) -> Union[str, Tuple[int, int]]:
+    """Parse an ``"x,y"`` pair into a tuple, passing keywords through."""
+    if "," in value:
+        x_str, y_str = value.split(",", maxsplit=1)
+        return int(x_str), int(y_str)
+    return value
+
+
+def resolve_position(
+    position: Union[str, Tuple[int, int]],
+    video_size: Tuple[int, int],
+    overlay_size: Tuple[int, int],
+) -> Union[str, Tuple[int, int]]:
+    """Resolve a keyword position to concrete pixel coordinates.
+
+    moviepy re-evaluates keyword positions on every frame; handing it a
+    constant ``(x, y)`` tuple instead removes that per-frame dispatch.
+    Unknown keywords are returned unchanged for moviepy to interpret.
+    """
+    if isinstance(position, tuple):
+        return position
+    video_w, video_h = video_size
+    overlay_w, overlay_h = overlay_size
+    if position == "center":
+        return (video_w - overlay_w) // 2, (video_h - overlay_h) // 2
+    if position == "top":
+        return (video_w - overlay_w) // 2, 0
+    if position == "bottom":
+        return (video_w - overlay_w) // 2, video_h - overlay_h
+    if position == "left":
+        return 0, (video_h - overlay_h) // 2
+    if position == "right":
+        return video_w - overlay_w, (video_h - overlay_h) // 2
+    return position
+
+
+# ffmpeg overlay x/y expressions for the moviepy-style position keywords
+FFMPEG_POSITIONS = {
+    "center": ("(main_w-overlay_w)/2", "(main_h-overlay_h)/2"),
+    "top": ("(main_w-overlay_w)/2", "0"),
+    "bottom": ("(main_w-overlay_w)/2", "main_h-overlay_h"),
+    "left": ("0", "(main_h-overlay_h)/2"),
+    "right": ("main_w-overlay_w", "(main_h-overlay_h)/2"),
+}
+
+
+# libx264 fallback parameters: veryfast skips the lookahead that
+# dominates x264 CPU time, and the explicit thread count, pixel format
+# and faststart flag avoid the encoder's conservative defaults
+X264_PARAMS = [
+    "-preset", "veryfast",
+    "-threads", str(os.cpu_count()),
+    "-pix_fmt", "yuv420p",
+    "-movflags", "+faststart",
+]
+
+
+# Hardware encoder per --hwaccel choice
+HW_CODECS = {
+    "videotoolbox": "h264_videotoolbox",
+    "cuda": "h264_nvenc",
+    "qsv": "h264_qsv",
+    "amf": "h264_amf",
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _ffmpeg_encoders() -> str:
+    """Return the output of ``ffmpeg -encoders`` (probed once, cached)."""
+    try:
+        return subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):  # pragma: no cover - no ffmpeg
+        return ""
+
+
+@functools.lru_cache(maxsize=None)
+def _ffmpeg_filters() -> str:
+    """Return the output of ``ffmpeg -filters`` (probed once, cached)."""
+    try:
+        return subprocess.run(
+            ["ffmpeg", "-hide_banner", "-filters"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):  # pragma: no cover - no ffmpeg
+        return ""
+
+
+def cuda_scale_filter() -> str | None:
+    """Return the available CUDA scaling filter, or ``None``.
+
+    NVENC being usable says nothing about the CUDA filters: scale_npp
+    needs a nonfree libnpp build that almost no packaged ffmpeg has.
+    Prefers scale_cuda (in standard builds) over scale_npp, and returns
+    ``None`` unless the rest of the GPU graph is available too, so
+    callers can keep the encode on NVENC but composite on the CPU.
+    """
+    filters = _ffmpeg_filters()
+    if "overlay_cuda" not in filters or "hwupload_cuda" not in filters:
+        return None
+    for name in ("scale_cuda", "scale_npp"):
+        if name in filters:
+            return name
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _encoder_works(codec: str) -> bool:
+    """Check ``codec`` by encoding one black frame from a lavfi source.
+
+    ``-encoders`` only says the encoder was compiled in; a stock ffmpeg
+    happily lists h264_nvenc on a machine with no NVIDIA GPU and then
+    fails at encode time. The trial costs a few milliseconds and is
+    cached for the life of the process.
+    """
+    try:
+        subprocess.run(
+            [
+                "ffmpeg", "-hide_banner", "-loglevel", "error",
+                "-f", "lavfi", "-i", "color=black:s=64x64:d=0.1",
+                "-frames:v", "1", "-c:v", codec, "-f", "null", "-",
+            ],
+            capture_output=True,
+            check=True,
+        )
+        return True
+    except (OSError, subprocess.CalledProcessError):
+        return False
+
+
+def pick_hw_codec(hwaccel: str = "auto") -> Tuple[str, list[str]]:
+    """Pick a hardware H.264 encoder, falling back to software libx264.
+
+    Returns the codec name and any extra ffmpeg parameters it needs.
+    """
+    if hwaccel == "none":
+        return "libx264", list(X264_PARAMS)
+
+    if hwaccel in HW_CODECS:
+        candidates = [HW_CODECS[hwaccel]]
+    elif sys.platform == "darwin":
+        candidates = ["h264_videotoolbox", "h264_nvenc", "h264_qsv", "h264_amf"]
+    else:
+        candidates = ["h264_nvenc", "h264_qsv", "h264_amf", "h264_videotoolbox"]
+
+    encoders = _ffmpeg_encoders()
+    for codec in candidates:
+        if codec in encoders and _encoder_works(codec):
+            if codec == "h264_nvenc":
+                return codec, ["-preset", "p4", "-rc", "vbr", "-cq", "23"]
+            if codec == "h264_videotoolbox":
+                return codec, ["-q:v", "60"]
+            return codec, []
+    return "libx264", list(X264_PARAMS)
+
+
+def extract_subclip(
+    video_path: str, clip_start: float, clip_end: float | None, target_path: str
+) -> None:
+    """Trim ``video_path`` to ``target_path`` with a frame-accurate cut.
+
+    Seeking with -ss before -i means ffmpeg never touches the discarded
+    range, so the cost scales with the kept range only. A stream copy
+    would be cheaper still, but it can only cut on keyframes, so the
+    trimmed file would start seconds early and every overlay timestamp
+    computed against it would fire early too; re-encoding just the kept
+    range keeps the cut exact.
+    """
+    cmd = ["ffmpeg", "-y", "-loglevel", "error", "-ss", str(clip_start)]
+    if clip_end is not None:
+        cmd += ["-to", str(clip_end)]
+    cmd += [
+        "-i", video_path,
+        "-c:v", "libx264", "-preset", "veryfast", "-crf", "18",
+        "-c:a", "copy",
+        target_path,
+    ]
+    subprocess.run(cmd, check=True)
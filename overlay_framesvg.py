@@ -9,56 +9,86 @@ can be composited over a video clip.
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
+import io
 import os
 import tempfile
+import urllib.request
 from typing import Tuple, Union
-from urllib.request import urlretrieve
-
-try:
-    import framesvg  # type: ignore
-except Exception as exc:  # pragma: no cover - framesvg is optional
-    raise ImportError(
-        "The FrameSVG package is required for this script."
-        " Install it with 'pip install framesvg'."
-    ) from exc
-
-try:
-    from moviepy.editor import (
-        VideoFileClip,
-        CompositeVideoClip,
-        ImageSequenceClip,
-    )
-except ImportError as exc:  # pragma: no cover - moviepy is optional
-    raise ImportError(
-        "The moviepy package is required for this script."
-        " Install it with 'pip install moviepy'."
-    ) from exc
 
-try:
-    import cairosvg  # used to rasterise SVG frames
-except Exception as exc:  # pragma: no cover - cairosvg is optional
-    raise ImportError(
-        "The cairosvg package is required for this script."
-        " Install it with 'pip install cairosvg'."
-    ) from exc
+import numpy as np
 
+from overlay_cli import extract_subclip, parse_position, pick_hw_codec, resolve_position
 
-def gif_url_to_svg(gif_url: str, svg_path: str) -> None:
-    """Download ``gif_url`` and convert it to an SVG at ``svg_path``."""
-    with tempfile.NamedTemporaryFile(suffix=".gif") as tmp_gif:
-        urlretrieve(gif_url, tmp_gif.name)
-        framesvg.convert(tmp_gif.name, svg_path)  # type: ignore[attr-defined]
 
+def _import_framesvg():
+    try:
+        import framesvg  # type: ignore
+    except Exception as exc:  # pragma: no cover - framesvg is optional
+        raise ImportError(
+            "The FrameSVG package is required for this script."
+            " Install it with 'pip install framesvg'."
+        ) from exc
+    return framesvg
 
-def svg_to_png_frames(svg_path: str, temp_dir: str) -> list[str]:
-    """Render an animated SVG to individual PNG frames."""
+
+def gif_url_to_svg(gif_url: str, svg_path: str) -> None:
+    """Download ``gif_url`` and convert it to an SVG at ``svg_path``.
+
+    The GIF is streamed into an in-memory buffer and handed straight to
+    framesvg, skipping the write-then-reread round-trip through a temp
+    file (and the stale file an interrupted download could leave behind).
+    """
+    framesvg = _import_framesvg()
+    with urllib.request.urlopen(gif_url, timeout=30) as response:
+        buf = io.BytesIO(response.read())
+    framesvg.convert(buf, svg_path)  # type: ignore[attr-defined]
+
+
+def _rasterize_frame(frame_xml: bytes) -> bytes:
+    """Rasterise a single SVG frame to PNG bytes (process-pool worker)."""
+    try:
+        import cairosvg  # used to rasterise SVG frames
+    except Exception as exc:  # pragma: no cover - cairosvg is optional
+        raise ImportError(
+            "The cairosvg package is required for this script."
+            " Install it with 'pip install cairosvg'."
+        ) from exc
+
+    return cairosvg.svg2png(bytestring=frame_xml)
+
+
+def svg_to_rgba_arrays(svg_path: str) -> Tuple[list[np.ndarray], float]:
+    """Render an animated SVG to in-memory RGBA frame arrays.
+
+    Each frame is rasterised in its own process: the frames are fully
+    independent and CPU-bound, and separate processes sidestep libcairo
+    thread-safety issues. Frames never touch disk — workers return PNG
+    bytes and the parent decodes them straight into numpy arrays that
+    ``ImageSequenceClip`` accepts directly.
+
+    Returns the frames together with the animation duration, so callers
+    don't have to parse the SVG a second time for timing.
+    """
+    try:
+        from PIL import Image  # used to decode rasterised frames in memory
+    except ImportError as exc:  # pragma: no cover - pillow ships with moviepy
+        raise ImportError(
+            "The pillow package is required for this script."
+            " Install it with 'pip install pillow'."
+        ) from exc
+
+    framesvg = _import_framesvg()
     sequence = framesvg.FrameSequence.from_svg(svg_path)  # type: ignore[attr-defined]
-    png_paths: list[str] = []
-    for i, frame in enumerate(sequence.frames):
-        png_path = os.path.join(temp_dir, f"frame_{i:04d}.png")
-        cairosvg.svg2png(bytestring=frame.to_string().encode(), write_to=png_path)
-        png_paths.append(png_path)
-    return png_paths
+    # Serialise in the parent so workers never touch the sequence
+    frame_xml = [frame.to_string().encode() for frame in sequence.frames]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+        png_blobs = list(pool.map(_rasterize_frame, frame_xml))
+    frames = [
+        np.asarray(Image.open(io.BytesIO(blob)).convert("RGBA"))
+        for blob in png_blobs
+    ]
+    return frames, sequence.duration
 
 
 def overlay_svg_on_video(
@@ -70,19 +100,43 @@ def overlay_svg_on_video(
     gif_start: float = 0.0,
     gif_end: float | None = None,
     position: Union[str, Tuple[int, int]] = (0, 0),
+    hwaccel: str = "auto",
 ) -> None:
     """Overlay an animated SVG converted from ``gif_url`` onto ``video_path``."""
+    try:
+        from moviepy.editor import (
+            VideoFileClip,
+            CompositeVideoClip,
+            ImageSequenceClip,
+        )
+    except ImportError as exc:  # pragma: no cover - moviepy is optional
+        raise ImportError(
+            "The moviepy package is required for this script."
+            " Install it with 'pip install moviepy'."
+        ) from exc
+
     with tempfile.TemporaryDirectory() as tmpdir:
         svg_path = os.path.join(tmpdir, "anim.svg")
         gif_url_to_svg(gif_url, svg_path)
-        frame_paths = svg_to_png_frames(svg_path, tmpdir)
+        frames, seq_duration = svg_to_rgba_arrays(svg_path)
 
-        video_clip = VideoFileClip(video_path)
+        # Trim with ffmpeg before moviepy opens the file, so frames
+        # outside the clip range are never decoded at all
         if clip_start != 0.0 or clip_end is not None:
-            video_clip = video_clip.subclip(clip_start, clip_end)
-
+            trimmed_path = os.path.join(tmpdir, "trimmed.mp4")
+            extract_subclip(video_path, clip_start, clip_end, trimmed_path)
+            video_clip = VideoFileClip(trimmed_path)
+        else:
+            video_clip = VideoFileClip(video_path)
+
+        # A constant (x, y) avoids moviepy's per-frame keyword dispatch
+        position = resolve_position(
+            position,
+            video_clip.size,
+            (frames[0].shape[1], frames[0].shape[0]),
+        )
         gif_clip = (
-            ImageSequenceClip(frame_paths, fps=len(frame_paths) / max(1, sequence_duration(svg_path)))
+            ImageSequenceClip(frames, fps=len(frames) / max(1, seq_duration))
             .set_start(gif_start)
             .set_position(position)
         )
@@ -90,13 +144,13 @@ def overlay_svg_on_video(
             gif_clip = gif_clip.set_end(gif_end)
 
         final_clip = CompositeVideoClip([video_clip, gif_clip])
-        final_clip.write_videofile(output_path, codec="libx264", audio_codec="aac")
-
-
-def sequence_duration(svg_path: str) -> float:
-    """Return the duration of an animated SVG created by FrameSVG."""
-    seq = framesvg.FrameSequence.from_svg(svg_path)  # type: ignore[attr-defined]
-    return seq.duration
+        codec, codec_params = pick_hw_codec(hwaccel)
+        final_clip.write_videofile(
+            output_path,
+            codec=codec,
+            audio_codec="aac",
+            ffmpeg_params=codec_params or None,
+        )
 
 
 def parse_args() -> argparse.Namespace:
@@ -112,21 +166,21 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--gif-end", type=float, default=None, help="Time in seconds when the SVG disappears")
     parser.add_argument(
         "--position",
+        type=parse_position,
         default="center",
         help="Position of SVG: (x,y) or keywords like 'center'",
     )
+    parser.add_argument(
+        "--hwaccel",
+        default="auto",
+        choices=["auto", "none", "cuda", "videotoolbox", "qsv", "amf"],
+        help="Hardware encoder to use (default: auto-detect, 'none' forces libx264)",
+    )
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
-    pos: Union[str, Tuple[int, int]]
-    if "," in args.position:
-        x_str, y_str = args.position.split(",", maxsplit=1)
-        pos = (int(x_str), int(y_str))
-    else:
-        pos = args.position
-
     overlay_svg_on_video(
         video_path=args.video,
         gif_url=args.gif_url,
@@ -135,7 +189,8 @@ def main() -> None:
         clip_end=args.clip_end,
         gif_start=args.gif_start,
         gif_end=args.gif_end,
-        position=pos,
+        position=args.position,
+        hwaccel=args.hwaccel,
     )
 
 
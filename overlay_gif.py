@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 """Overlay an animated GIF onto an MP4 video.
 
-This script uses ``moviepy`` to place a GIF on top of a video. It can
-optionally trim the input video and control when the GIF appears and
-disappears.
+This script drives ffmpeg's native ``overlay`` filter to place a GIF on
+top of a video. It can optionally trim the input video and control when
+the GIF appears and disappears. Compositing happens entirely inside a
+single ffmpeg process, so no frame ever round-trips through Python.
 
 Example usage::
 
@@ -15,15 +16,318 @@ Example usage::
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
+import hashlib
+import os
+import subprocess
+import tempfile
 from typing import Tuple, Union
 
-try:
-    from moviepy.editor import VideoFileClip, CompositeVideoClip
-except ImportError as exc:  # pragma: no cover - moviepy is optional
-    raise ImportError(
-        "The moviepy package is required for this script."
-        " Install it with 'pip install moviepy'."
-    ) from exc
+from overlay_cli import (
+    FFMPEG_POSITIONS,
+    cuda_scale_filter,
+    parse_position,
+    pick_hw_codec,
+)
+
+# Preconverted GIFs are cached here, content-addressed by the GIF bytes
+_GIF_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "parakeet-gifs"
+)
+
+
+def _gif_to_webm(gif_path: str) -> str:
+    """Pre-convert ``gif_path`` to a cached VP9 WebM with alpha.
+
+    ffmpeg's gif demuxer re-does LZW decode and palette lookup on every
+    run; converting once to VP9 (yuva420p keeps the transparency) makes
+    every later overlay of the same GIF decode the cheap format
+    instead. Falls back to the original GIF when the conversion is not
+    possible (e.g. no libvpx in this ffmpeg build).
+    """
+    with open(gif_path, "rb") as gif:
+        key = hashlib.sha1(gif.read()).hexdigest()
+    cached_webm = os.path.join(_GIF_CACHE_DIR, f"{key}.webm")
+    if os.path.exists(cached_webm):
+        return cached_webm
+
+    os.makedirs(_GIF_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{cached_webm}.{os.getpid()}.tmp"
+    cmd = [
+        "ffmpeg", "-y", "-loglevel", "error",
+        "-i", gif_path,
+        "-c:v", "libvpx-vp9", "-pix_fmt", "yuva420p", "-auto-alt-ref", "0",
+        "-f", "webm", tmp_path,
+    ]
+    try:
+        subprocess.run(cmd, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return gif_path
+    os.replace(tmp_path, cached_webm)
+    return cached_webm
+
+
+def _source_audio_codec(video_path: str) -> str | None:
+    """Return the codec name of the first audio stream, or ``None``."""
+    try:
+        probed = subprocess.run(
+            [
+                "ffprobe", "-v", "error", "-select_streams", "a:0",
+                "-show_entries", "stream=codec_name", "-of", "csv=p=0",
+                video_path,
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):  # pragma: no cover - no ffprobe
+        return None
+    return probed or None
+
+
+def _source_video_codec(video_path: str) -> str | None:
+    """Return the codec name of the first video stream, or ``None``."""
+    try:
+        probed = subprocess.run(
+            [
+                "ffprobe", "-v", "error", "-select_streams", "v:0",
+                "-show_entries", "stream=codec_name", "-of", "csv=p=0",
+                video_path,
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):  # pragma: no cover - no ffprobe
+        return None
+    return probed or None
+
+
+def _uring_readahead(video_path: str, liburing) -> None:
+    """Read ``video_path`` through io_uring to warm the page cache.
+
+    A small ring of 1 MiB reads is kept in flight so the drive streams
+    at queue depth instead of one synchronous read at a time — the
+    payoff case is a cold NVMe cache with a video larger than RAM.
+    """
+    chunk = 1 << 20
+    depth = 8
+    fd = os.open(video_path, os.O_RDONLY)
+    ring = liburing.io_uring()
+    cqe = liburing.io_uring_cqe()
+    buffers = [bytearray(chunk) for _ in range(depth)]
+    try:
+        liburing.io_uring_queue_init(depth, ring, 0)
+        size = os.fstat(fd).st_size
+        offset = 0
+        inflight = 0
+        while offset < size or inflight:
+            while inflight < depth and offset < size:
+                sqe = liburing.io_uring_get_sqe(ring)
+                if sqe is None:
+                    break
+                buf = buffers[(offset // chunk) % depth]
+                liburing.io_uring_prep_read(sqe, fd, buf, chunk, offset)
+                offset += chunk
+                inflight += 1
+            liburing.io_uring_submit(ring)
+            liburing.io_uring_wait_cqe(ring, cqe)
+            liburing.io_uring_cqe_seen(ring, cqe)
+            inflight -= 1
+    finally:
+        liburing.io_uring_queue_exit(ring)
+        os.close(fd)
+
+
+def _prime_input(video_path: str, io_uring: bool = False) -> None:
+    """Warm the page cache for ``video_path`` before ffmpeg opens it.
+
+    With ``--io-uring`` and python-liburing installed, the file is
+    streamed through an io_uring read ring; otherwise (or on any
+    failure) it degrades to posix_fadvise(WILLNEED), and to a no-op on
+    platforms without it. ffmpeg keeps reading the file itself — a
+    pipe would break -ss seeking and mp4 moov-atom probing — it just
+    finds the pages already resident.
+    """
+    if io_uring:
+        try:
+            import liburing
+        except ImportError:
+            liburing = None
+        if liburing is not None:
+            try:
+                _uring_readahead(video_path, liburing)
+                return
+            except Exception:
+                pass  # fall through to fadvise
+    try:
+        fd = os.open(video_path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+    except (AttributeError, OSError):
+        pass
+
+
+def _video_duration(video_path: str) -> float | None:
+    """Return the container duration in seconds, or ``None``."""
+    try:
+        probed = subprocess.run(
+            [
+                "ffprobe", "-v", "error",
+                "-show_entries", "format=duration", "-of", "csv=p=0",
+                video_path,
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        return float(probed)
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return None
+
+
+def _keyframe_times(video_path: str) -> list[float]:
+    """Return the keyframe timestamps of the first video stream."""
+    try:
+        probed = subprocess.run(
+            [
+                "ffprobe", "-v", "error", "-select_streams", "v:0",
+                "-skip_frame", "nokey",
+                "-show_entries", "frame=pts_time", "-of", "csv=p=0",
+                video_path,
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return []
+    times = []
+    for line in probed.splitlines():
+        line = line.strip().rstrip(",")
+        if line:
+            try:
+                times.append(float(line))
+            except ValueError:
+                continue
+    return sorted(times)
+
+
+def _extract_copy(
+    video_path: str, span_start: float, span_end: float, target_path: str
+) -> None:
+    """Stream-copy ``[span_start, span_end]`` of ``video_path``."""
+    subprocess.run(
+        [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-ss", str(span_start), "-to", str(span_end),
+            "-i", video_path, "-c", "copy", target_path,
+        ],
+        check=True,
+    )
+
+
+def _try_split_concat(
+    video_path: str,
+    gif_path: str,
+    output_path: str,
+    clip_start: float,
+    clip_end: float | None,
+    gif_start: float,
+    gif_end: float | None,
+    position,
+    hwaccel: str,
+) -> bool:
+    """Re-encode only the span where the GIF is visible.
+
+    When the overlay window is interior to the clip, the spans before
+    and after it carry no compositing work, so they are stream-copied
+    and stitched back with the concat demuxer — O(overlay duration)
+    encode CPU instead of O(clip duration). The split points snap
+    outward to keyframes so the copies stay valid. Returns ``False``
+    when the window covers (nearly) the whole clip or probing fails,
+    in which case the caller should encode the clip in one pass.
+    """
+    # concat -c copy only produces a valid file when every part shares
+    # codec parameters. The middle span is encoded as H.264/AAC, so the
+    # copied spans must already be that; anything else (HEVC, VP9, ...)
+    # would concatenate without error but play back corrupt.
+    if _source_video_codec(video_path) != "h264":
+        return False
+    if _source_audio_codec(video_path) not in (None, "aac"):
+        return False
+
+    duration = _video_duration(video_path)
+    if duration is None:
+        return False
+    start = clip_start
+    end = clip_end if clip_end is not None else duration
+    visible_from = start + gif_start
+    visible_to = start + gif_end if gif_end is not None else end
+
+    keyframes = _keyframe_times(video_path)
+    if not keyframes:
+        return False
+    split0 = max((k for k in keyframes if k <= visible_from), default=start)
+    split1 = min((k for k in keyframes if k >= visible_to), default=end)
+    split0, split1 = max(split0, start), min(split1, end)
+
+    # Not worth three passes unless a meaningful span is copy-only
+    if split0 - start < 1.0 and end - split1 < 1.0:
+        return False
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        parts = []
+        if split0 - start >= 1.0:
+            pre_path = os.path.join(tmpdir, "pre.mp4")
+            _extract_copy(video_path, start, split0, pre_path)
+            parts.append(pre_path)
+        else:
+            split0 = start
+
+        mid_path = os.path.join(tmpdir, "mid.mp4")
+        overlay_gif_on_video(
+            video_path,
+            gif_path,
+            mid_path,
+            clip_start=split0,
+            clip_end=split1 if split1 < end else clip_end,
+            gif_start=visible_from - split0,
+            gif_end=visible_to - split0 if gif_end is not None else None,
+            position=position,
+            hwaccel=hwaccel,
+        )
+        parts.append(mid_path)
+
+        if end - split1 >= 1.0:
+            post_path = os.path.join(tmpdir, "post.mp4")
+            _extract_copy(video_path, split1, end, post_path)
+            parts.append(post_path)
+
+        list_path = os.path.join(tmpdir, "parts.txt")
+        with open(list_path, "w") as listing:
+            listing.writelines(f"file '{part}'\n" for part in parts)
+        subprocess.run(
+            [
+                "ffmpeg", "-y", "-loglevel", "error",
+                "-f", "concat", "-safe", "0", "-i", list_path,
+                "-c", "copy", output_path,
+            ],
+            check=True,
+        )
+    return True
+
+
+def _overlay_xy(position: Union[str, Tuple[int, int]]) -> Tuple[str, str]:
+    """Translate ``position`` into ffmpeg ``overlay`` x/y expressions."""
+    if isinstance(position, tuple):
+        return str(position[0]), str(position[1])
+    try:
+        return FFMPEG_POSITIONS[position]
+    except KeyError:
+        raise ValueError(f"Unsupported position: {position!r}") from None
 
 
 def overlay_gif_on_video(
@@ -35,6 +339,8 @@ def overlay_gif_on_video(
     gif_start: float = 0.0,
     gif_end: float | None = None,
     position: Union[str, Tuple[int, int]] = (0, 0),
+    hwaccel: str = "auto",
+    io_uring: bool = False,
 ) -> None:
     """Overlay ``gif_path`` onto ``video_path``.
 
@@ -54,49 +360,259 @@ def overlay_gif_on_video(
     gif_start:
         Time (in seconds) when the GIF should appear.
     gif_end:
-        Time (in seconds) when the GIF should disappear. ``None`` means to use
-        the GIF's full duration.
+        Time (in seconds) when the GIF should disappear. ``None`` means to
+        keep it until the end of the clip.
     position:
         Coordinates or keyword position for the GIF.
+    hwaccel:
+        Hardware encoder choice; "auto" probes, "none" forces libx264.
+    io_uring:
+        Pre-read the video through io_uring when python-liburing is
+        installed; only pays off when the read itself is the bottleneck.
     """
 
-    video_clip = VideoFileClip(video_path)
+    _prime_input(video_path, io_uring)
+
+    # Long clip, short overlay: stream-copy the spans with no GIF and
+    # re-encode only the window where compositing actually happens
+    if gif_start > 0 or gif_end is not None:
+        if _try_split_concat(
+            video_path,
+            gif_path,
+            output_path,
+            clip_start,
+            clip_end,
+            gif_start,
+            gif_end,
+            position,
+            hwaccel,
+        ):
+            return
+
+    x, y = _overlay_xy(position)
+    if gif_end is not None:
+        enable = f"between(t,{gif_start},{gif_end})"
+    else:
+        enable = f"gte(t,{gif_start})"
+
+    codec, codec_params = pick_hw_codec(hwaccel)
+    # The GPU composite needs the CUDA filters on top of NVENC, and most
+    # packaged ffmpeg builds lack them; without them the encode still
+    # goes to NVENC but the overlay runs on the CPU.
+    scale_filter = cuda_scale_filter() if codec == "h264_nvenc" else None
+    cuda = scale_filter is not None
+
+    # Delay the GIF's timestamps so its animation starts when it appears,
+    # then composite; shortest=1 ends the (looping) GIF with the video.
+    # With the CUDA graph the video is also decoded with NVDEC and kept
+    # on the GPU through the composite (overlay_cuda needs NV12, hence
+    # the scale filter), so no frame ever crosses PCIe.
+    filter_parts = []
+    video_label = "0:v"
+    if cuda:
+        filter_parts.append(f"[0:v]{scale_filter}=format=nv12[v0]")
+        video_label = "v0"
+    gif_chain = []
+    if gif_start:
+        gif_chain.append(f"setpts=PTS-STARTPTS+{gif_start}/TB")
+    if cuda:
+        gif_chain.append("hwupload_cuda")
+    gif_label = "1:v"
+    if gif_chain:
+        filter_parts.append(f"[1:v]{','.join(gif_chain)}[gif]")
+        gif_label = "gif"
+    overlay_filter = "overlay_cuda" if cuda else "overlay"
+    filter_parts.append(
+        f"[{video_label}][{gif_label}]"
+        f"{overlay_filter}={x}:{y}:shortest=1:enable='{enable}'[vout]"
+    )
+
+    cmd = ["ffmpeg", "-y", "-loglevel", "error"]
+    if cuda:
+        cmd += ["-hwaccel", "cuda", "-hwaccel_output_format", "cuda"]
     if clip_start != 0.0 or clip_end is not None:
-        video_clip = video_clip.subclip(clip_start, clip_end)
+        # Seek before -i so the discarded range is never decoded
+        cmd += ["-ss", str(clip_start)]
+        if clip_end is not None:
+            cmd += ["-to", str(clip_end)]
+    overlay_path = _gif_to_webm(gif_path)
+    if overlay_path is gif_path:
+        loop_args = ["-ignore_loop", "0"]  # gif demuxer fallback
+    else:
+        loop_args = ["-stream_loop", "-1"]
+    cmd += [
+        "-i", video_path,
+        *loop_args, "-i", overlay_path,
+        "-filter_complex", ";".join(filter_parts),
+        "-map", "[vout]", "-map", "0:a?",
+        "-c:v", codec, *codec_params,
+        # Stream-copy audio that is already AAC instead of re-encoding it
+        "-c:a", "copy" if _source_audio_codec(video_path) == "aac" else "aac",
+        output_path,
+    ]
+    subprocess.run(cmd, check=True)
+
 
-    gif_clip = VideoFileClip(gif_path).set_start(gif_start).set_position(position)
+# Jobs per ffmpeg invocation in batch mode: each invocation pays codec
+# registration and option parsing once for the whole group
+_BATCH_GROUP_SIZE = 4
+
+
+def _run_group(jobs: list[Tuple[str, str, str]], kwargs: dict) -> None:
+    """Encode a group of manifest jobs in one ffmpeg invocation.
+
+    ffmpeg startup (binary load, codec registration, option parsing)
+    costs hundreds of milliseconds, which dominates short clips. One
+    invocation with N input pairs and N mapped outputs pays it once
+    per group instead of once per job. The split-concat fast path does
+    not apply here — grouped jobs share a single filter graph.
+    """
+    clip_start = kwargs.get("clip_start", 0.0)
+    clip_end = kwargs.get("clip_end")
+    gif_start = kwargs.get("gif_start", 0.0)
+    gif_end = kwargs.get("gif_end")
+    position = kwargs.get("position", (0, 0))
+    hwaccel = kwargs.get("hwaccel", "auto")
+
+    x, y = _overlay_xy(position)
     if gif_end is not None:
-        gif_clip = gif_clip.set_end(gif_end)
+        enable = f"between(t,{gif_start},{gif_end})"
+    else:
+        enable = f"gte(t,{gif_start})"
+    codec, codec_params = pick_hw_codec(hwaccel)
+    scale_filter = cuda_scale_filter() if codec == "h264_nvenc" else None
+    cuda = scale_filter is not None
+    overlay_filter = "overlay_cuda" if cuda else "overlay"
+
+    cmd = ["ffmpeg", "-y", "-loglevel", "error"]
+    filter_parts = []
+    output_args = []
+    for job, (video_path, gif_path, output_path) in enumerate(jobs):
+        video_idx = 2 * job
+        if cuda:
+            cmd += ["-hwaccel", "cuda", "-hwaccel_output_format", "cuda"]
+        if clip_start != 0.0 or clip_end is not None:
+            cmd += ["-ss", str(clip_start)]
+            if clip_end is not None:
+                cmd += ["-to", str(clip_end)]
+        cmd += ["-i", video_path]
+        overlay_path = _gif_to_webm(gif_path)
+        if overlay_path is gif_path:
+            cmd += ["-ignore_loop", "0", "-i", overlay_path]
+        else:
+            cmd += ["-stream_loop", "-1", "-i", overlay_path]
+
+        video_label = f"{video_idx}:v"
+        if cuda:
+            filter_parts.append(f"[{video_idx}:v]{scale_filter}=format=nv12[v{job}]")
+            video_label = f"v{job}"
+        gif_chain = []
+        if gif_start:
+            gif_chain.append(f"setpts=PTS-STARTPTS+{gif_start}/TB")
+        if cuda:
+            gif_chain.append("hwupload_cuda")
+        gif_label = f"{video_idx + 1}:v"
+        if gif_chain:
+            filter_parts.append(f"[{gif_label}]{','.join(gif_chain)}[gif{job}]")
+            gif_label = f"gif{job}"
+        filter_parts.append(
+            f"[{video_label}][{gif_label}]"
+            f"{overlay_filter}={x}:{y}:shortest=1:enable='{enable}'[vout{job}]"
+        )
+        output_args += [
+            "-map", f"[vout{job}]", "-map", f"{video_idx}:a?",
+            "-c:v", codec, *codec_params,
+            "-c:a", "copy" if _source_audio_codec(video_path) == "aac" else "aac",
+            output_path,
+        ]
+
+    cmd += ["-filter_complex", ";".join(filter_parts)] + output_args
+    subprocess.run(cmd, check=True)
+
+
+def run_batch(manifest_path: str, **kwargs) -> None:
+    """Process a manifest of ``video,gif,output`` lines in parallel.
+
+    Jobs are grouped so each ffmpeg invocation encodes several of them
+    (amortising process startup), and groups run in a process pool for
+    near-linear speedup until the encoder saturates. Consumer NVIDIA
+    GPUs only allow a couple of concurrent NVENC sessions, so the pool
+    is capped at 2 when NVENC is in use.
+    """
+    jobs = []
+    with open(manifest_path) as manifest:
+        for line in manifest:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            video_path, gif_path, output_path = (
+                part.strip() for part in line.split(",", maxsplit=2)
+            )
+            jobs.append((video_path, gif_path, output_path))
 
-    final_clip = CompositeVideoClip([video_clip, gif_clip])
-    final_clip.write_videofile(output_path, codec="libx264", audio_codec="aac")
+    groups = [
+        jobs[i : i + _BATCH_GROUP_SIZE]
+        for i in range(0, len(jobs), _BATCH_GROUP_SIZE)
+    ]
+    codec, _ = pick_hw_codec(kwargs.get("hwaccel", "auto"))
+    max_workers = 2 if codec == "h264_nvenc" else os.cpu_count()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_run_group, group, kwargs) for group in groups]
+        for future in futures:
+            future.result()
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Overlay GIF onto MP4 video")
-    parser.add_argument("--video", required=True, help="Input MP4 video path")
-    parser.add_argument("--gif", required=True, help="GIF file to overlay")
-    parser.add_argument("--output", required=True, help="Output MP4 path")
+    parser.add_argument("--video", help="Input MP4 video path")
+    parser.add_argument("--gif", help="GIF file to overlay")
+    parser.add_argument("--output", help="Output MP4 path")
+    parser.add_argument(
+        "--batch",
+        default=None,
+        help="Manifest of 'video,gif,output' lines to process in parallel",
+    )
     parser.add_argument("--clip-start", type=float, default=0.0, help="Start time of the video clip")
     parser.add_argument("--clip-end", type=float, default=None, help="End time of the video clip")
     parser.add_argument("--gif-start", "--start", dest="gif_start", type=float, default=0.0, help="Time in seconds when the GIF appears")
     parser.add_argument("--gif-end", type=float, default=None, help="Time in seconds when the GIF disappears")
     parser.add_argument(
         "--position",
+        type=parse_position,
         default="center",
         help="Position of GIF: (x,y) or keywords like 'center', 'top', etc.",
     )
+    parser.add_argument(
+        "--hwaccel",
+        default="auto",
+        choices=["auto", "none", "cuda", "videotoolbox", "qsv", "amf"],
+        help="Hardware encoder to use (default: auto-detect, 'none' forces libx264)",
+    )
+    parser.add_argument(
+        "--io-uring",
+        action="store_true",
+        help="Pre-read the video via io_uring (needs python-liburing; falls back gracefully)",
+    )
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
-    pos: Union[str, Tuple[int, int]]
-    if "," in args.position:
-        x_str, y_str = args.position.split(",", maxsplit=1)
-        pos = (int(x_str), int(y_str))
-    else:
-        pos = args.position
+
+    if args.batch is not None:
+        run_batch(
+            args.batch,
+            clip_start=args.clip_start,
+            clip_end=args.clip_end,
+            gif_start=args.gif_start,
+            gif_end=args.gif_end,
+            position=args.position,
+            hwaccel=args.hwaccel,
+        )
+        return
+
+    if not (args.video and args.gif and args.output):
+        raise SystemExit("--video, --gif and --output are required without --batch")
 
     overlay_gif_on_video(
         video_path=args.video,
@@ -106,7 +622,9 @@ def main() -> None:
         clip_end=args.clip_end,
         gif_start=args.gif_start,
         gif_end=args.gif_end,
-        position=pos,
+        position=args.position,
+        hwaccel=args.hwaccel,
+        io_uring=args.io_uring,
     )
 
 
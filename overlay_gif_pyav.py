@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""Overlay an animated GIF onto an MP4 video using PyAV.
+
+Alternative to ``overlay_gif.py`` that keeps the compositing loop in
+Python but swaps moviepy's reader/writer for PyAV (libav bindings).
+Decoded frames are handed over as views on the decoder buffer — no
+per-frame memcpy into Python lists — the blend runs through the numba
+kernel from ``bubble_kernels``, and encoded frames are muxed straight
+back out. Audio packets are remuxed untouched.
+
+Example usage::
+
+    python overlay_gif_pyav.py --video input.mp4 --gif anim.gif \
+        --gif-start 5 --position center --output output.mp4
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+from typing import Tuple, Union
+
+import numpy as np
+
+try:
+    import av
+except ImportError as exc:  # pragma: no cover - pyav is optional
+    raise ImportError(
+        "The av package is required for this script."
+        " Install it with 'pip install av'."
+    ) from exc
+
+from bubble_kernels import blend_rgba
+from overlay_cli import parse_position, resolve_position
+
+
+def _load_gif_frames(gif_path: str) -> Tuple[list, list, list[float]]:
+    """Decode the GIF once into RGB frames, float alpha masks and times."""
+    rgbs, alphas, times = [], [], []
+    with av.open(gif_path) as gif:
+        stream = gif.streams.video[0]
+        time_base = float(stream.time_base)
+        for frame in gif.decode(stream):
+            rgba = frame.to_ndarray(format="rgba")
+            rgbs.append(np.ascontiguousarray(rgba[:, :, :3]))
+            alphas.append(rgba[:, :, 3].astype(np.float32) / 255.0)
+            times.append(
+                float(frame.pts * time_base) if frame.pts is not None else 0.0
+            )
+    return rgbs, alphas, times
+
+
+def _blend(frame_rgb, over_rgb, alpha, x: int, y: int) -> None:
+    """Blend in place, via the numba kernel when it is available."""
+    if blend_rgba is not None:
+        blend_rgba(frame_rgb, over_rgb, alpha, x, y, frame_rgb)
+        return
+    h, w = over_rgb.shape[:2]
+    region = frame_rgb[y : y + h, x : x + w]
+    a = alpha[:, :, None]
+    region[:] = (over_rgb * a + region * (1.0 - a)).astype(np.uint8)
+
+
+def overlay_gif_on_video(
+    video_path: str,
+    gif_path: str,
+    output_path: str,
+    gif_start: float = 0.0,
+    gif_end: float | None = None,
+    position: Union[str, Tuple[int, int]] = (0, 0),
+) -> None:
+    """Overlay ``gif_path`` onto ``video_path`` via PyAV.
+
+    Parameters
+    ----------
+    video_path:
+        Path to the input MP4 video.
+    gif_path:
+        Path to the animated GIF to overlay.
+    output_path:
+        Where to save the resulting video.
+    gif_start:
+        Time (in seconds) when the GIF should appear.
+    gif_end:
+        Time (in seconds) when the GIF should disappear. ``None`` means to
+        keep it until the end of the video.
+    position:
+        Coordinates or keyword position for the GIF.
+    """
+    gif_rgbs, gif_alphas, gif_times = _load_gif_frames(gif_path)
+    # Last frame holds until the loop restarts; assume uniform spacing
+    if len(gif_times) > 1:
+        gif_duration = gif_times[-1] + (gif_times[-1] - gif_times[-2])
+    else:
+        gif_duration = 0.0
+
+    with av.open(video_path) as in_c, av.open(output_path, "w") as out_c:
+        in_video = in_c.streams.video[0]
+        out_video = out_c.add_stream("libx264", rate=in_video.average_rate)
+        out_video.width = in_video.width
+        out_video.height = in_video.height
+        out_video.pix_fmt = "yuv420p"
+
+        # Audio is stream-copied packet by packet, never decoded
+        in_audio = in_c.streams.audio[0] if in_c.streams.audio else None
+        out_audio = (
+            out_c.add_stream(template=in_audio) if in_audio is not None else None
+        )
+
+        xy = resolve_position(
+            position,
+            (in_video.width, in_video.height),
+            (gif_rgbs[0].shape[1], gif_rgbs[0].shape[0]),
+        )
+        if not isinstance(xy, tuple):
+            raise ValueError(f"Unsupported position: {position!r}")
+        x, y = xy
+
+        # Neither the numba kernel nor the numpy fallback clips its
+        # write rectangle, so crop the GIF frames once to the part that
+        # lands inside the video and clamp (x, y) to the frame
+        gif_h, gif_w = gif_rgbs[0].shape[:2]
+        top = max(0, -y)
+        left = max(0, -x)
+        bottom = gif_h - max(0, y + gif_h - in_video.height)
+        right = gif_w - max(0, x + gif_w - in_video.width)
+        if top >= bottom or left >= right:
+            gif_rgbs = []  # fully off-frame: nothing to blend
+        elif (top, left, bottom, right) != (0, 0, gif_h, gif_w):
+            gif_rgbs = [
+                np.ascontiguousarray(rgb[top:bottom, left:right])
+                for rgb in gif_rgbs
+            ]
+            gif_alphas = [
+                np.ascontiguousarray(a[top:bottom, left:right])
+                for a in gif_alphas
+            ]
+            x, y = max(x, 0), max(y, 0)
+
+        streams = [in_video] if in_audio is None else [in_video, in_audio]
+        for packet in in_c.demux(streams):
+            if packet.dts is None:
+                continue
+            if in_audio is not None and packet.stream == in_audio:
+                packet.stream = out_audio
+                out_c.mux(packet)
+                continue
+            for frame in packet.decode():
+                t = frame.time or 0.0
+                visible = t >= gif_start and (gif_end is None or t <= gif_end)
+                if visible and gif_rgbs:
+                    if gif_duration > 0:
+                        loop_t = (t - gif_start) % gif_duration
+                        idx = bisect.bisect_right(gif_times, loop_t) - 1
+                    else:
+                        idx = 0
+                    rgb = frame.to_ndarray(format="rgb24")
+                    _blend(rgb, gif_rgbs[idx], gif_alphas[idx], x, y)
+                    new_frame = av.VideoFrame.from_ndarray(rgb, format="rgb24")
+                    new_frame.pts = frame.pts
+                    new_frame.time_base = frame.time_base
+                    out_c.mux(out_video.encode(new_frame))
+                else:
+                    out_c.mux(out_video.encode(frame))
+        out_c.mux(out_video.encode())  # flush the encoder
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Overlay GIF onto MP4 video using PyAV"
+    )
+    parser.add_argument("--video", required=True, help="Input MP4 video path")
+    parser.add_argument("--gif", required=True, help="GIF file to overlay")
+    parser.add_argument("--output", required=True, help="Output MP4 path")
+    parser.add_argument("--gif-start", "--start", dest="gif_start", type=float, default=0.0, help="Time in seconds when the GIF appears")
+    parser.add_argument("--gif-end", type=float, default=None, help="Time in seconds when the GIF disappears")
+    parser.add_argument(
+        "--position",
+        type=parse_position,
+        default="center",
+        help="Position of GIF: (x,y) or keywords like 'center', 'top', etc.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    overlay_gif_on_video(
+        video_path=args.video,
+        gif_path=args.gif,
+        output_path=args.output,
+        gif_start=args.gif_start,
+        gif_end=args.gif_end,
+        position=args.position,
+    )
+
+
+if __name__ == "__main__":
+    main()
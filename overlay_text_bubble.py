@@ -4,6 +4,11 @@
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
+import copy
+import functools
+import hashlib
+import io
 import os
 import tempfile
 from typing import Tuple, Union
@@ -24,9 +29,25 @@ except ImportError as exc:  # pragma: no cover - moviepy is optional
         " Install it with 'pip install moviepy'."
     ) from exc
 
+import numpy as np
 
-def create_text_bubble(text: str, width: int, height: int) -> str:
-    """Create a speech bubble containing ``text`` and return a PNG path."""
+from bubble_kernels import blend_rgba
+from overlay_cli import parse_position, pick_hw_codec, resolve_position
+
+
+# Rendered bubbles are cached here, content-addressed by (text, width, height);
+# shared with clip_with_bubble, which uses the same key scheme
+_BUBBLE_CACHE_DIR = os.path.join(tempfile.gettempdir(), "bubble_cache")
+
+
+@functools.lru_cache(maxsize=8)
+def _bubble_chrome(width: int, height: int) -> draw.Drawing:
+    """Build the text-free bubble (rectangle + pointer) for one size.
+
+    The chrome never changes between captions of the same size, so it
+    is built once per ``(width, height)`` and shared; callers copy it
+    and append only the ``Text`` element.
+    """
     drawing = draw.Drawing(width, height, origin=(0, 0))
 
     rect_height = height - 20
@@ -59,21 +80,95 @@ def create_text_bubble(text: str, width: int, height: int) -> str:
         )
     )
 
+    return drawing
+
+
+def create_text_bubble(text: str, width: int, height: int) -> bytes:
+    """Create a speech bubble containing ``text`` and return PNG bytes.
+
+    Identical bubbles are rasterised only once: the PNG is stored under a
+    hash of ``(text, width, height)`` and reused on subsequent calls.
+    """
+    key = hashlib.blake2b(
+        f"{text}|{width}|{height}".encode(), digest_size=16
+    ).hexdigest()
+    cached_png = os.path.join(_BUBBLE_CACHE_DIR, f"{key}.png")
+    if os.path.exists(cached_png):
+        with open(cached_png, "rb") as cached:
+            return cached.read()
+
+    chrome = _bubble_chrome(width, height)
+    drawing = copy.copy(chrome)
+    drawing.elements = list(chrome.elements)  # keep the cached chrome pristine
+
     drawing.append(
         draw.Text(
             text,
             20,
             width / 2,
-            rect_height / 2,
+            (height - 20) / 2,
             center=True,
             valign="middle",
             fill="black",
         )
     )
 
-    tmp = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
-    drawing.save_png(tmp.name)
-    return tmp.name
+    # Rasterise in memory; the PNG only touches disk to populate the cache
+    png_bytes = drawing.rasterize().png_data
+
+    os.makedirs(_BUBBLE_CACHE_DIR, exist_ok=True)
+    # A fixed per-process scratch path skips the mkstemp/O_EXCL dance;
+    # the rename stays atomic so concurrent renders cannot clash
+    tmp_path = f"{cached_png}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as tmp:
+        tmp.write(png_bytes)
+    os.replace(tmp_path, cached_png)
+    return png_bytes
+
+
+@functools.lru_cache(maxsize=32)
+def _bubble_rgba(text: str, width: int, height: int) -> np.ndarray:
+    """Decode the bubble PNG to an RGBA array ``ImageClip`` takes directly."""
+    try:
+        from PIL import Image  # used to decode the rasterised bubble in memory
+    except ImportError as exc:  # pragma: no cover - pillow ships with moviepy
+        raise ImportError(
+            "The pillow package is required for this script."
+            " Install it with 'pip install pillow'."
+        ) from exc
+
+    png_bytes = create_text_bubble(text, width, height)
+    return np.asarray(Image.open(io.BytesIO(png_bytes)).convert("RGBA"))
+
+
+class _JitCompositeVideoClip(CompositeVideoClip):
+    """CompositeVideoClip that alpha-blends with the numba kernel.
+
+    Only usable when the overlay sits at a fixed pixel position; the
+    caller falls back to moviepy's own blit otherwise.
+    """
+
+    def __init__(self, base_clip, overlay_clip, xy: Tuple[int, int]):
+        super().__init__([base_clip, overlay_clip])
+        x, y = xy
+        # The bubble is a constant image, so grab its frame and mask
+        # once. moviepy masks are float64; the AOT kernel's signature is
+        # float32, so cast here rather than per frame.
+        over = overlay_clip.get_frame(0)
+        alpha = np.asarray(overlay_clip.mask.get_frame(0), dtype=np.float32)
+
+        def make_frame(t):
+            frame = base_clip.get_frame(t).copy()
+            if t < overlay_clip.start or (
+                overlay_clip.end is not None and t >= overlay_clip.end
+            ):
+                return frame
+            blend_rgba(frame, over, alpha, x, y, frame)
+            return frame
+
+        # CompositeVideoClip wires make_frame up in __init__, so the
+        # override has to be an instance attribute too
+        self.make_frame = make_frame
 
 
 def overlay_text_bubble_on_video(
@@ -85,48 +180,141 @@ def overlay_text_bubble_on_video(
     position: Union[str, Tuple[int, int]] = "center",
     width: int = 300,
     height: int = 100,
+    hwaccel: str = "auto",
 ) -> None:
     """Overlay a speech bubble on ``video_path``."""
-    bubble_png = create_text_bubble(text, width, height)
+    # Hand moviepy the decoded array directly — no PNG tempfile round-trip
+    bubble_rgba = _bubble_rgba(text, width, height)
 
+    # One reader for the whole run; close it even if the encode fails,
+    # since each open VideoFileClip holds an ffmpeg subprocess
     video_clip = VideoFileClip(video_path)
-    bubble_clip = ImageClip(bubble_png).set_start(start).set_position(position)
-    if end is not None:
-        bubble_clip = bubble_clip.set_end(end)
-    else:
-        bubble_clip = bubble_clip.set_duration(video_clip.duration)
+    try:
+        # A constant (x, y) avoids moviepy's per-frame keyword dispatch
+        # and also unlocks the JIT composite path for keyword positions
+        position = resolve_position(
+            position,
+            video_clip.size,
+            (bubble_rgba.shape[1], bubble_rgba.shape[0]),
+        )
+        bubble_clip = (
+            ImageClip(bubble_rgba, transparent=True)
+            .set_start(start)
+            .set_position(position)
+        )
+        if end is not None:
+            bubble_clip = bubble_clip.set_end(end)
+        else:
+            bubble_clip = bubble_clip.set_duration(video_clip.duration)
+
+        # The kernel writes an unclamped rectangle, so it is only safe
+        # when the bubble lies fully inside the frame; moviepy's own
+        # blit crops partially off-frame overlays correctly
+        fits = (
+            isinstance(position, tuple)
+            and 0 <= position[0]
+            and 0 <= position[1]
+            and position[0] + bubble_rgba.shape[1] <= video_clip.size[0]
+            and position[1] + bubble_rgba.shape[0] <= video_clip.size[1]
+        )
+        if blend_rgba is not None and fits and bubble_clip.mask is not None:
+            final_clip = _JitCompositeVideoClip(video_clip, bubble_clip, position)
+        else:
+            final_clip = CompositeVideoClip([video_clip, bubble_clip])
+        try:
+            codec, codec_params = pick_hw_codec(hwaccel)
+            final_clip.write_videofile(
+                output_path,
+                codec=codec,
+                audio_codec="aac",
+                ffmpeg_params=codec_params or None,
+            )
+        finally:
+            final_clip.close()
+    finally:
+        video_clip.close()
+
+
+def _batch_job(job: Tuple[str, str, str], kwargs: dict) -> None:
+    """Run one manifest line (process-pool worker)."""
+    video_path, text, output_path = job
+    overlay_text_bubble_on_video(video_path, text, output_path, **kwargs)
+
 
-    final_clip = CompositeVideoClip([video_clip, bubble_clip])
-    final_clip.write_videofile(output_path, codec="libx264", audio_codec="aac")
+def run_batch(manifest_path: str, **kwargs) -> None:
+    """Process a manifest of ``video,text,output`` lines in parallel.
 
-    os.unlink(bubble_png)
+    Each job is an independent encode, so a process pool gives
+    near-linear speedup until the encoder saturates. Consumer NVIDIA
+    GPUs only allow a couple of concurrent NVENC sessions, so the pool
+    is capped at 2 when NVENC is in use.
+    """
+    jobs = []
+    with open(manifest_path) as manifest:
+        for line in manifest:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            # The caption may itself contain commas, so split the path
+            # fields off the ends and leave the middle intact
+            video_path, rest = line.split(",", maxsplit=1)
+            text, output_path = rest.rsplit(",", maxsplit=1)
+            jobs.append((video_path.strip(), text.strip(), output_path.strip()))
+
+    codec, _ = pick_hw_codec(kwargs.get("hwaccel", "auto"))
+    max_workers = 2 if codec == "h264_nvenc" else os.cpu_count()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_batch_job, job, kwargs) for job in jobs]
+        for future in futures:
+            future.result()
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Overlay text bubble onto MP4 video")
-    parser.add_argument("--video", required=True, help="Input MP4 video path")
-    parser.add_argument("--text", required=True, help="Text to display in bubble")
-    parser.add_argument("--output", required=True, help="Output MP4 path")
+    parser.add_argument("--video", help="Input MP4 video path")
+    parser.add_argument("--text", help="Text to display in bubble")
+    parser.add_argument("--output", help="Output MP4 path")
+    parser.add_argument(
+        "--batch",
+        default=None,
+        help="Manifest of 'video,text,output' lines to process in parallel",
+    )
     parser.add_argument("--start", type=float, default=0.0, help="Time when bubble appears")
     parser.add_argument("--end", type=float, default=None, help="Time when bubble disappears")
     parser.add_argument(
         "--position",
+        type=parse_position,
         default="center",
         help="Position of bubble: (x,y) or keywords like 'center', 'top', etc.",
     )
     parser.add_argument("--bubble-width", type=int, default=300, help="Bubble width in pixels")
     parser.add_argument("--bubble-height", type=int, default=100, help="Bubble height in pixels")
+    parser.add_argument(
+        "--hwaccel",
+        default="auto",
+        choices=["auto", "none", "cuda", "videotoolbox", "qsv", "amf"],
+        help="Hardware encoder to use (default: auto-detect, 'none' forces libx264)",
+    )
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
-    pos: Union[str, Tuple[int, int]]
-    if "," in args.position:
-        x_str, y_str = args.position.split(",", maxsplit=1)
-        pos = (int(x_str), int(y_str))
-    else:
-        pos = args.position
+
+    if args.batch is not None:
+        run_batch(
+            args.batch,
+            start=args.start,
+            end=args.end,
+            position=args.position,
+            width=args.bubble_width,
+            height=args.bubble_height,
+            hwaccel=args.hwaccel,
+        )
+        return
+
+    if not (args.video and args.text and args.output):
+        raise SystemExit("--video, --text and --output are required without --batch")
 
     overlay_text_bubble_on_video(
         video_path=args.video,
@@ -134,9 +322,10 @@ def main() -> None:
         output_path=args.output,
         start=args.start,
         end=args.end,
-        position=pos,
+        position=args.position,
         width=args.bubble_width,
         height=args.bubble_height,
+        hwaccel=args.hwaccel,
     )
 
 